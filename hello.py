@@ -6,9 +6,14 @@ audio visualization, and playback controls.
 
 # Standard library imports
 import io
+import json
 import os
+import queue
 import random
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 # Third-party imports
@@ -17,14 +22,44 @@ from tkinter import filedialog, ttk
 import numpy as np
 import pygame
 from PIL import Image, ImageTk
-from mutagen import File as MutagenFile
+from mutagen import File as MutagenFile, MutagenError
+from mutagen.aac import AAC
+from mutagen.asf import ASF
+from mutagen.flac import FLAC
 from mutagen.mp3 import MP3
+from mutagen.mp4 import MP4
+from mutagen.oggvorbis import OggVorbis
+from mutagen.wave import WAVE
 from mutagen.id3 import ID3, APIC
 
 
+# Track metadata is cached here between launches
+METADATA_CACHE_PATH = Path.home() / ".cache" / "musicplayer" / "meta.json"
+
+# Supported audio formats (lowercase, without the leading dot)
+AUDIO_EXTS = frozenset({'mp3', 'wav', 'ogg', 'flac', 'm4a', 'aac', 'wma'})
+
+# Posted by pygame when the music stream finishes (or is stopped)
+TRACK_END_EVENT = pygame.USEREVENT + 1
+
+
 class MusicPlayer:
     """Main Music Player application class."""
     
+    # Leading track numbers in file names (e.g., "07. " or "07 - ")
+    _NUMBER_RE = re.compile(r'^\d+[\.\-\s]+')
+    
+    # Mutagen classes by extension, so files can skip format sniffing
+    _MUTAGEN_BY_EXT = {
+        '.mp3': MP3,
+        '.flac': FLAC,
+        '.ogg': OggVorbis,
+        '.m4a': MP4,
+        '.aac': AAC,
+        '.wav': WAVE,
+        '.wma': ASF,
+    }
+    
     def __init__(self, root):
         """Initialize the music player application."""
         self.root = root
@@ -35,8 +70,18 @@ class MusicPlayer:
         # Initialize pygame mixer
         pygame.mixer.init()
         
+        # The end-of-track event needs SDL's event queue, which the display module sets up.
+        # If SDL can't start a video driver, fall back to polling get_busy().
+        try:
+            pygame.display.init()
+            pygame.mixer.music.set_endevent(TRACK_END_EVENT)
+            self._has_event_queue = True
+        except pygame.error:
+            self._has_event_queue = False
+        
         # Initialize application state
         self._init_variables()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Create UI
         self.create_widgets()
@@ -46,9 +91,15 @@ class MusicPlayer:
         """Initialize all instance variables."""
         # Playlist variables
         self.playlist = []
+        self._playlist_set = set()  # Same paths as playlist, for fast membership tests
         self.current_track_index = -1
         self.sort_type = "Name"  # Default sort type
-        self.track_metadata = {}  # Cache for track metadata
+        self.track_metadata = self.load_metadata_cache()  # Cache for track metadata
+        self._metadata_dirty = False  # Unsaved changes to track_metadata
+        # Tag reading is I/O bound, so threads overlap the file reads
+        self._tag_executor = ThreadPoolExecutor(max_workers=8)
+        self._pending_scans = []  # (new paths, [(path, key, future), ...]) per unfinished scan
+        self._scan_job = None
         
         # Playback state
         self.is_paused = False
@@ -60,13 +111,50 @@ class MusicPlayer:
         self.is_seeking = False
         self.seek_offset = 0
         
+        # Pending Tk callbacks that only run during playback
+        self._pump_job = None
+        self._tick_job = None
+        
+        # Last second shown in the current time label
+        self._last_cur_s = -1
+        
         # Visual elements
         self.current_album_art = None
+        self._art_cache = OrderedDict()  # File path -> PhotoImage, least recently used first
+        self._art_cache_size = 64
+        self._art_executor = ThreadPoolExecutor(max_workers=1)
+        self._pending_art_future = None
         self.visualizer_bars = 32
-        self.bar_heights = [0] * self.visualizer_bars
+        self.bar_heights = np.zeros(self.visualizer_bars, dtype=np.float32)
+        # Bar colors for low (green), medium (blue) and high (red) levels
+        self._vis_palette = np.array([[0x2e, 0xcc, 0x71], [0x34, 0x98, 0xdb], [0xe7, 0x4c, 0x3c]], dtype=np.uint8)
+        
+        # Spectrum analysis state
+        self._fft_size = 1024
+        self._hann = np.hanning(self._fft_size).astype(np.float32)
+        bin_edges = self.log_bin_edges(self._fft_size // 2 + 1, self.visualizer_bars)
+        self._bin_starts = bin_edges[:-1]
+        self._bin_widths = np.diff(bin_edges).astype(np.float32)
+        self._vis_samples = None  # Decoded PCM of the current track
+        self._vis_future = None  # Pending background decode
+        # A daemon worker, so an in-flight decode never holds up exiting
+        self._vis_queue = queue.Queue()
+        threading.Thread(target=self._visualizer_worker, daemon=True).start()
+        self._vis_rate = 44100
+        self._vis_job = None  # Pending animation frame
+        self._vis_idle_frames = 0  # Frames since the bars settled at zero
+        self._vis_db_offset = 0.0
+        # Longest track (seconds) decoded for the visualizer; 10 minutes of
+        # 44.1 kHz mono int16 PCM is about 53 MB held while it plays. Tracks
+        # over the cap, and formats pygame can't load as a Sound (m4a, aac,
+        # wma), get a flat visualizer instead of reacting to the music.
+        self._vis_max_length = 10 * 60
         
         # Debug flag
-        self.debug_mode = True
+        self.debug_mode = False
+        if not self.debug_mode:
+            # Skip the method body entirely when debugging is off
+            self.debug = lambda *args, **kwargs: None
     
     # ==================== UTILITY METHODS ====================
     
@@ -77,20 +165,38 @@ class MusicPlayer:
     
     def format_time(self, seconds):
         """Format seconds into MM:SS format."""
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes}:{secs:02d}"
+        s = int(seconds)
+        return f"{s // 60}:{s % 60:02d}"
     
-    def get_track_info(self, file_path):
-        """Get track metadata for sorting."""
-        if file_path in self.track_metadata:
-            return self.track_metadata[file_path]
+    @staticmethod
+    def log_bin_edges(n_bins, n_bands):
+        """Build log-spaced rFFT bin edges (skipping DC) so each band has at least one bin."""
+        edges = np.geomspace(1, n_bins, n_bands + 1).astype(np.intp)
+        for k in range(1, n_bands + 1):
+            if edges[k] <= edges[k - 1]:
+                edges[k] = edges[k - 1] + 1
+        edges[-1] = n_bins
+        return edges
+    
+    @staticmethod
+    def _open_track(file_path):
+        """Open a file with Mutagen once and return (length, tag info, album art bytes)."""
+        length = None
+        title = Path(file_path).stem
+        artist = "Unknown Artist"
+        album = "Unknown Album"
+        album_art_data = None
         
         try:
-            audio = MutagenFile(file_path)
-            title = Path(file_path).stem
-            artist = "Unknown Artist"
-            album = "Unknown Album"
+            mutagen_class = MusicPlayer._MUTAGEN_BY_EXT.get(Path(file_path).suffix.lower())
+            try:
+                audio = mutagen_class(file_path) if mutagen_class else MutagenFile(file_path)
+            except MutagenError:
+                # Wrong extension for the contents (e.g. Opus in .ogg); let Mutagen sniff it
+                audio = MutagenFile(file_path)
+            
+            if audio is not None:
+                length = getattr(audio.info, 'length', None)
             
             if audio is not None and hasattr(audio, 'tags') and audio.tags:
                 # Try to get title
@@ -110,144 +216,363 @@ class MusicPlayer:
                     album = str(audio.tags['TALB'])
                 elif 'album' in audio.tags:
                     album = str(audio.tags['album'][0])
-            
-            # Cache the metadata
-            self.track_metadata[file_path] = {'title': title, 'artist': artist, 'album': album}
-            return self.track_metadata[file_path]
+                
+                # Try to get album art (ID3 APIC frames, whatever their description)
+                apic_frames = audio.tags.getall('APIC') if hasattr(audio.tags, 'getall') else []
+                if apic_frames:
+                    album_art_data = apic_frames[0].data
         except:
-            info = {'title': Path(file_path).stem, 'artist': "Unknown Artist", 'album': "Unknown Album"}
-            self.track_metadata[file_path] = info
-            return info
+            pass
+        
+        info = {'title': title, 'artist': artist, 'album': album}
+        return length, info, album_art_data
+    
+    @staticmethod
+    def _read_tags(file_path):
+        """Read tags and length from a file (safe to call from worker threads)."""
+        length, info, album_art_data = MusicPlayer._open_track(file_path)
+        info['length'] = length
+        info['has_art'] = album_art_data is not None
+        return info
+    
+    def get_track_info(self, file_path):
+        """Get track metadata for sorting."""
+        if file_path not in self.track_metadata:
+            self.track_metadata[file_path] = self._read_tags(file_path)
+        return self.track_metadata[file_path]
+    
+    def cache_track_metadata(self, entries):
+        """Start background tag reads for new or modified files (os.DirEntry objects); returns (path, key, future) for each."""
+        stale = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            # Unchanged files keep their cached tags
+            key = [st.st_mtime_ns, st.st_size]
+            cached = self.track_metadata.get(entry.path)
+            if cached is None or cached.get('key') != key:
+                stale.append((entry.path, key))
+        
+        self.debug(f"Reading tags for {len(stale)} of {len(entries)} files")
+        return [
+            (file_path, key, self._tag_executor.submit(self._read_tags, file_path))
+            for file_path, key in stale
+        ]
+    
+    def _poll_scans(self):
+        """Add scanned tracks to the playlist once all of their tags have been read."""
+        self._scan_job = None
+        unfinished = []
+        for new_paths, pending in self._pending_scans:
+            if not all(future.done() for _, _, future in pending):
+                unfinished.append((new_paths, pending))
+                continue
+            
+            for file_path, key, future in pending:
+                info = future.result()
+                info['key'] = key
+                self.track_metadata[file_path] = info
+            if pending:
+                self._metadata_dirty = True
+            
+            self.playlist.extend(new_paths)
+            if self.playlist:
+                self.sort_playlist(None)
+        
+        self._pending_scans = unfinished
+        if unfinished:
+            self._scan_job = self.root.after(50, self._poll_scans)
+    
+    def cancel_scans(self):
+        """Drop scans whose tags are still being read."""
+        for _, pending in self._pending_scans:
+            for _, _, future in pending:
+                future.cancel()
+        self._pending_scans = []
+        if self._scan_job is not None:
+            self.root.after_cancel(self._scan_job)
+            self._scan_job = None
+    
+    def load_metadata_cache(self):
+        """Load the track metadata cache saved by a previous session."""
+        try:
+            with open(METADATA_CACHE_PATH, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        # Drop entries from older schemas or hand edits that lack the fields the UI reads
+        return {
+            file_path: info for file_path, info in data.items()
+            if isinstance(info, dict) and all(isinstance(info.get(field), str) for field in ('title', 'artist', 'album'))
+        }
+    
+    def save_metadata_cache(self):
+        """Write the track metadata cache to disk if it has changed."""
+        if not self._metadata_dirty:
+            return
+        try:
+            METADATA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = METADATA_CACHE_PATH.with_suffix(".tmp")
+            # Leave out files that have been deleted or moved so the cache doesn't only grow
+            existing = {
+                file_path: info for file_path, info in self.track_metadata.items()
+                if os.path.exists(file_path)
+            }
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(existing, f)
+            os.replace(tmp_path, METADATA_CACHE_PATH)
+            self._metadata_dirty = False
+        except OSError as e:
+            self.debug(f"Error saving metadata cache: {e}")
     
     # ==================== ALBUM ART METHODS ====================
     
     def set_default_album_art(self):
         """Set a default placeholder album art."""
-        img = Image.new('RGB', (120, 120), color='#1a1a1a')
-        photo = ImageTk.PhotoImage(img)
-        self.album_art_label.config(image=photo)
-        self.album_art_label.image = photo
+        self.album_art_label.config(image=self._default_art_photo)
+        self.album_art_label.image = self._default_art_photo
     
-    def load_album_art(self, file_path):
-        """Extract and display album art from audio file."""
+    @staticmethod
+    def _decode_art(album_art_data):
+        """Decode and shrink album art bytes (runs on the art worker thread, no Tk access)."""
+        img = Image.open(io.BytesIO(album_art_data))
+        # Let libjpeg scale down while decoding large JPEG covers
         try:
-            audio = MutagenFile(file_path)
-            
-            # Try to extract album art
-            album_art_data = None
-            
-            if hasattr(audio, 'tags'):
-                # For MP3 files
-                if 'APIC:' in audio.tags:
-                    album_art_data = audio.tags['APIC:'].data
-                elif 'APIC::' in audio.tags:
-                    album_art_data = audio.tags['APIC::'].data
-                # Try other APIC tags
-                else:
-                    for tag in audio.tags:
-                        if tag.startswith('APIC'):
-                            album_art_data = audio.tags[tag].data
-                            break
-            
-            if album_art_data:
-                # Load image from bytes
-                img = Image.open(io.BytesIO(album_art_data))
-                img = img.resize((120, 120), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.album_art_label.config(image=photo)
-                self.album_art_label.image = photo
-                self.debug("Album art loaded successfully")
-            else:
-                self.debug("No album art found in file")
-                self.set_default_album_art()
-        except Exception as e:
-            self.debug(f"Error loading album art: {e}")
+            img.draft("RGB", (240, 240))
+        except Exception:
+            pass
+        img.thumbnail((120, 120), Image.Resampling.LANCZOS)
+        return img
+    
+    def load_album_art(self, file_path, album_art_data):
+        """Display album art from the cache or embedded image bytes, or the placeholder if there are none."""
+        # Whatever was still decoding belongs to the previous track
+        if self._pending_art_future is not None:
+            self._pending_art_future.cancel()
+            self._pending_art_future = None
+        
+        photo = self._art_cache.get(file_path)
+        if photo is not None:
+            self._art_cache.move_to_end(file_path)
+            self.album_art_label.config(image=photo)
+            self.album_art_label.image = photo
+            self.debug("Album art loaded from cache")
+            return
+        
+        if not album_art_data:
+            self.debug("No album art found in file")
             self.set_default_album_art()
+            return
+        
+        # Decode in the background so playback starts right away
+        future = self._art_executor.submit(self._decode_art, album_art_data)
+        self._pending_art_future = future
+        self.root.after(20, self._apply_art, future, file_path)
     
-    def load_track_metadata(self, file_path):
-        """Load and display track metadata"""
+    def _apply_art(self, future, file_path):
+        """Show decoded album art once the worker has finished with it."""
+        if future is not self._pending_art_future:
+            return  # A newer track replaced it
+        if not future.done():
+            self.root.after(20, self._apply_art, future, file_path)
+            return
+        self._pending_art_future = None
+        
         try:
-            audio = MutagenFile(file_path)
-            title = Path(file_path).stem
-            artist = "Unknown Artist"
-            album = "Unknown Album"
+            # PhotoImage has to be created on the Tk thread
+            photo = ImageTk.PhotoImage(future.result())
+            self.album_art_label.config(image=photo)
+            self.album_art_label.image = photo
+            self.debug("Album art loaded successfully")
             
-            if audio is not None and hasattr(audio, 'tags') and audio.tags:
-                # Try to get title
-                if 'TIT2' in audio.tags:
-                    title = str(audio.tags['TIT2'])
-                elif 'title' in audio.tags:
-                    title = str(audio.tags['title'][0])
-                
-                # Try to get artist
-                if 'TPE1' in audio.tags:
-                    artist = str(audio.tags['TPE1'])
-                elif 'artist' in audio.tags:
-                    artist = str(audio.tags['artist'][0])
-                
-                # Try to get album
-                if 'TALB' in audio.tags:
-                    album = str(audio.tags['TALB'])
-                elif 'album' in audio.tags:
-                    album = str(audio.tags['album'][0])
-            
-            self.np_title_label.config(text=title)
-            self.np_artist_label.config(text=artist)
-            self.np_album_label.config(text=album)
-            self.debug(f"Loaded metadata: {title} - {artist}")
+            self._art_cache[file_path] = photo
+            if len(self._art_cache) > self._art_cache_size:
+                self._art_cache.popitem(last=False)
         except Exception as e:
-            self.debug(f"Error loading metadata: {e}")
-            self.np_title_label.config(text=Path(file_path).stem)
-            self.np_artist_label.config(text="Unknown Artist")
-            self.np_album_label.config(text="Unknown Album")
+            self.debug(f"Error loading album art: {e}")
+            self.set_default_album_art()
+    
+    def load_track_metadata(self, info):
+        """Display track metadata"""
+        self.np_title_label.config(text=info['title'])
+        self.np_artist_label.config(text=info['artist'])
+        self.np_album_label.config(text=info['album'])
+        self.debug(f"Loaded metadata: {info['title']} - {info['artist']}")
     
     # ==================== VISUALIZER METHODS ====================
     
+    @staticmethod
+    def _decode_samples(file_path):
+        """Decode a whole track to mono PCM (runs on the visualizer worker thread)."""
+        # samples() views the Sound's buffer rather than copying it
+        samples = pygame.sndarray.samples(pygame.mixer.Sound(file_path))
+        if samples.ndim == 2:
+            # Downmix once here so only mono PCM is kept and the Sound can be freed
+            if np.issubdtype(samples.dtype, np.integer):
+                mono = samples.sum(axis=1, dtype=np.int32) // samples.shape[1]
+                samples = mono.astype(samples.dtype)
+            else:
+                samples = samples.mean(axis=1, dtype=np.float32)
+        return samples
+    
+    def _visualizer_worker(self):
+        """Decode queued tracks one at a time (runs on the visualizer worker thread)."""
+        while True:
+            future, file_path = self._vis_queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue  # Skipped before the decode started
+            try:
+                future.set_result(self._decode_samples(file_path))
+            except Exception as e:
+                future.set_exception(e)
+    
+    def load_visualizer_samples(self, file_path, length):
+        """Start decoding a track for the visualizer without blocking playback."""
+        self.release_visualizer_samples()
+        # The whole track is decoded into memory, so skip long or unreadable ones
+        if not length or length > self._vis_max_length:
+            self.debug("Track length unknown or too long for the visualizer, skipping decode")
+            return
+        self._vis_future = Future()
+        self._vis_queue.put((self._vis_future, file_path))
+    
+    def release_visualizer_samples(self):
+        """Drop the current track's PCM and any decode still waiting to run."""
+        if self._vis_future is not None:
+            self._vis_future.cancel()
+            self._vis_future = None
+        self._vis_samples = None
+    
+    def set_visualizer_samples(self, samples):
+        """Keep the decoded PCM of the current track for spectrum analysis."""
+        self._vis_rate = pygame.mixer.get_init()[0]
+        
+        # Shift decibels so a full-scale sine sits at 0 dB regardless of sample format
+        if np.issubdtype(samples.dtype, np.integer):
+            full_scale = float(np.iinfo(samples.dtype).max) + 1.0
+        else:
+            full_scale = 1.0
+        self._vis_db_offset = 20.0 * np.log10(full_scale * self._hann.sum() / 2)
+        self._vis_samples = samples
+    
+    def compute_spectrum(self):
+        """Return a 0-1 level per visualizer bar for the audio at the playback position."""
+        pos = (pygame.mixer.music.get_pos() / 1000.0) + self.seek_offset
+        start = int(pos * self._vis_rate)
+        block = self._vis_samples[start:start + self._fft_size]
+        
+        # Pad the tail of the track
+        if len(block) < self._fft_size:
+            block = np.pad(block, (0, self._fft_size - len(block)))
+        
+        # Audio is real-valued, so rfft gives the same spectrum at half the cost
+        spectrum = np.fft.rfft(block * self._hann)
+        power = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
+        
+        # Average the bins of each band in a single pass
+        bands = np.add.reduceat(power, self._bin_starts) / self._bin_widths
+        
+        # Only take the log of the 32 displayed bands
+        db = 10.0 * np.log10(bands + 1e-9) - self._vis_db_offset
+        return np.clip((db + 60.0) / 60.0, 0.0, 1.0)
+    
+    def on_visualizer_resize(self, event):
+        """Cache the visualizer canvas width when it changes."""
+        if event.width > 1:
+            self._vis_width = event.width
+    
+    def resize_visualizer_buffer(self, width, height):
+        """Allocate the visualizer frame buffer and per-column lookup tables for a canvas size."""
+        # RGBA so the Pillow image can share the array's memory instead of copying it
+        self._vis_frame = np.zeros((height, width, 4), dtype=np.uint8)
+        self._vis_frame[:, :, 3] = 255
+        self._vis_img = Image.frombuffer('RGBA', (width, height), self._vis_frame, 'raw', 'RGBA', 0, 1)
+        self._vis_photo = ImageTk.PhotoImage(self._vis_img)
+        
+        # Map each pixel column to its bar, leaving a 1px gap on either side of every bar
+        bar_width = width / self.visualizer_bars
+        columns = np.arange(width)
+        self._vis_col_bar = np.minimum((columns / bar_width).astype(np.intp), self.visualizer_bars - 1)
+        offset = columns - self._vis_col_bar * bar_width
+        self._vis_col_on = (offset >= 1) & (offset < bar_width - 1)
+        self._vis_rows = np.arange(height)[:, None]
+        
+        if self._vis_item is None:
+            self._vis_item = self.visualizer_canvas.create_image(0, 0, anchor=tk.NW, image=self._vis_photo)
+        else:
+            self.visualizer_canvas.itemconfig(self._vis_item, image=self._vis_photo)
+    
     def animate_visualizer(self):
         """Animate the audio visualizer."""
-        self.visualizer_canvas.delete("all")
+        # Pick up the samples once the background decode has finished
+        if self._vis_future is not None and self._vis_future.done():
+            future, self._vis_future = self._vis_future, None
+            try:
+                self.set_visualizer_samples(future.result())
+            except Exception as e:
+                self.debug(f"Error decoding visualizer samples: {e}")
         
-        canvas_width = self.visualizer_canvas.winfo_width()
-        if canvas_width <= 1:
-            canvas_width = 550  # Default width
+        # Nothing to draw while the window is minimized or hidden
+        if not self.visualizer_canvas.winfo_viewable():
+            self._vis_job = self.root.after(250, self.animate_visualizer)
+            return
         
+        canvas_width = self._vis_width
         canvas_height = 80
-        bar_width = canvas_width / self.visualizer_bars
+        if self._vis_photo is None or self._vis_frame.shape[1] != canvas_width:
+            self.resize_visualizer_buffer(canvas_width, canvas_height)
         
         # Update bar heights with smooth animation
-        if pygame.mixer.music.get_busy() and not self.is_paused:
-            # Create dynamic animation based on music playing
-            for i in range(self.visualizer_bars):
-                # Simulate audio response with random values and smoothing
-                target = random.uniform(0.3, 1.0) * canvas_height * 0.8
-                self.bar_heights[i] += (target - self.bar_heights[i]) * 0.3
+        playing = pygame.mixer.music.get_busy() and not self.is_paused
+        if playing and self._vis_samples is not None:
+            # Follow the spectrum of the audio currently playing
+            targets = self.compute_spectrum() * (canvas_height * 0.8)
+            self.bar_heights += (targets - self.bar_heights) * 0.3
         else:
             # Decay bars when not playing
-            for i in range(self.visualizer_bars):
-                self.bar_heights[i] *= 0.85
-        
-        # Draw bars
-        for i in range(self.visualizer_bars):
-            x = i * bar_width
-            height = self.bar_heights[i]
-            y = canvas_height - height
-            
-            # Color gradient based on height
-            if height > canvas_height * 0.6:
-                color = "#e74c3c"  # Red for high
-            elif height > canvas_height * 0.3:
-                color = "#3498db"  # Blue for medium
-            else:
-                color = "#2ecc71"  # Green for low
-            
-            self.visualizer_canvas.create_rectangle(
-                x + 1, y, x + bar_width - 1, canvas_height,
-                fill=color,
-                outline=""
-            )
+            self.bar_heights *= 0.85
+        
+        has_input = playing and self._vis_samples is not None
+        if not has_input and self.bar_heights.max() < 0.5:
+            # Bars have settled: clear them once, then just check back occasionally,
+            # sooner while a decode is pending so its samples are picked up quickly
+            if self._vis_idle_frames == 0:
+                self.bar_heights.fill(0)
+                self.draw_visualizer(canvas_height)
+            self._vis_idle_frames += 1
+            delay = 50 if self._vis_future is not None else 250
+        else:
+            self._vis_idle_frames = 0
+            self.draw_visualizer(canvas_height)
+            delay = 50
         
         # Continue animation
-        self.root.after(50, self.animate_visualizer)
+        self._vis_job = self.root.after(delay, self.animate_visualizer)
+    
+    def draw_visualizer(self, canvas_height):
+        """Draw the current bar heights into the visualizer image."""
+        # Color gradient based on height
+        levels = (self.bar_heights > canvas_height * 0.3).astype(np.intp)
+        levels += self.bar_heights > canvas_height * 0.6
+        col_colors = self._vis_palette[levels][self._vis_col_bar]
+        
+        # Fill every pixel below the top of its column's bar, then upload the frame in one go
+        col_heights = self.bar_heights[self._vis_col_bar] * self._vis_col_on
+        lit = self._vis_rows >= canvas_height - col_heights
+        np.multiply(lit[:, :, None], col_colors, out=self._vis_frame[:, :, :3])
+        self._vis_photo.paste(self._vis_img)
+    
+    def wake_visualizer(self):
+        """Go back to full frame rate right away, e.g. when playback starts."""
+        self._vis_idle_frames = 0
+        if self._vis_job is not None:
+            self.root.after_cancel(self._vis_job)
+        self.animate_visualizer()
     
     # ==================== UI CREATION METHODS ====================
         
@@ -288,6 +613,7 @@ class MusicPlayer:
             fg="black",
             selectbackground="#000080",
             selectforeground="white",
+            activestyle="none",
             font=("MS Sans Serif", 9)
         )
         self.playlist_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -313,6 +639,12 @@ class MusicPlayer:
             bd=2
         )
         self.visualizer_canvas.pack(fill=tk.X, pady=5)
+        self.visualizer_canvas.bind('<Configure>', self.on_visualizer_resize)
+        
+        # The bars are drawn into one image; its buffers are built on the first frame
+        self._vis_width = 550  # Default width until the canvas is mapped
+        self._vis_item = None
+        self._vis_photo = None
         self.animate_visualizer()
         
         # Time Scrubber Frame
@@ -458,6 +790,9 @@ class MusicPlayer:
             bd=2
         )
         self.album_art_label.pack()
+        
+        # Placeholder art is built once and shared by every track without art
+        self._default_art_photo = ImageTk.PhotoImage(Image.new('RGB', (120, 120), color='#1a1a1a'))
         self.set_default_album_art()
         
         # Now Playing Info
@@ -515,24 +850,36 @@ class MusicPlayer:
         
         self.debug(f"Scanning directory: {directory}")
         
-        # Supported audio formats
-        audio_extensions = {'.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac', '.wma'}
-        
         # Scan directory recursively for audio files
-        files_found = 0
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if Path(file).suffix.lower() in audio_extensions:
-                    file_path = os.path.join(root, file)
-                    if file_path not in self.playlist:
-                        self.playlist.append(file_path)
-                        files_found += 1
+        new_entries = [e for e in self._iter_audio(directory) if e.path not in self._playlist_set]
+        new_paths = [e.path for e in new_entries]
         
-        self.debug(f"Found {files_found} audio files")
+        self.debug(f"Found {len(new_paths)} audio files")
         
-        # Sort the playlist after scanning
-        if self.playlist:
-            self.sort_playlist(None)
+        # Claim the paths now so scanning again before the tags are read doesn't add them twice
+        self._playlist_set.update(new_paths)
+        
+        # Read all metadata in the background; the tracks are added and sorted when it's done
+        pending = self.cache_track_metadata(new_entries)
+        self._pending_scans.append((new_paths, pending))
+        if self._scan_job is None:
+            self._poll_scans()
+    
+    @staticmethod
+    def _iter_audio(directory):
+        """Yield os.DirEntry objects for supported audio files under a directory, recursively."""
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # DirEntry type checks use the cached directory listing, no extra stat
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from MusicPlayer._iter_audio(entry.path)
+                    elif entry.is_file():
+                        _, dot, ext = entry.name.rpartition('.')
+                        if dot and ext.lower() in AUDIO_EXTS:
+                            yield entry
+        except OSError:
+            pass
     
     def sort_playlist(self, event):
         """Sort the playlist based on selected criteria."""
@@ -547,13 +894,10 @@ class MusicPlayer:
         if self.current_track_index >= 0 and self.current_track_index < len(self.playlist):
             current_track = self.playlist[self.current_track_index]
         
-        # Sort based on selected criteria
-        if sort_by == "Name":
-            self.playlist.sort(key=lambda x: self.get_track_info(x)['title'].lower())
-        elif sort_by == "Artist":
-            self.playlist.sort(key=lambda x: (self.get_track_info(x)['artist'].lower(), self.get_track_info(x)['title'].lower()))
-        elif sort_by == "Album":
-            self.playlist.sort(key=lambda x: (self.get_track_info(x)['album'].lower(), self.get_track_info(x)['title'].lower()))
+        # Sort based on selected criteria, building each key exactly once
+        keys = [self._sort_key(track, sort_by) for track in self.playlist]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.playlist = [self.playlist[i] for i in order]
         
         # Update the current track index
         if current_track:
@@ -565,15 +909,28 @@ class MusicPlayer:
         # Update the display
         self.update_playlist_display()
     
+    def _sort_key(self, file_path, sort_by):
+        """Build the lowercased sort key for a track."""
+        info = self.get_track_info(file_path)
+        title = info['title'].lower()
+        if sort_by == "Artist":
+            return (info['artist'].lower(), title)
+        if sort_by == "Album":
+            return (info['album'].lower(), title)
+        return (title,)
+    
     def update_playlist_display(self):
         """Refresh the playlist display."""
+        # Remove any existing numbering from the filenames
+        items = [
+            f"{i}. {MusicPlayer._NUMBER_RE.sub('', Path(track).stem)}"
+            for i, track in enumerate(self.playlist, 1)
+        ]
+        
+        # Insert everything in one Tcl call
         self.playlist_box.delete(0, tk.END)
-        for i, track in enumerate(self.playlist, 1):
-            # Remove any existing numbering from the filename
-            track_name = Path(track).stem
-            # Strip leading numbers and dots/dashes (e.g., "07. " or "07 - ")
-            track_name = re.sub(r'^\d+[\.\-\s]+', '', track_name)
-            self.playlist_box.insert(tk.END, f"{i}. {track_name}")
+        if items:
+            self.playlist_box.insert(tk.END, *items)
         
         # Reselect the current track if playing
         if self.current_track_index >= 0 and self.current_track_index < len(self.playlist):
@@ -583,8 +940,9 @@ class MusicPlayer:
     def clear_playlist(self):
         """Clear all tracks from the playlist."""
         self.stop_music()
+        self.cancel_scans()
         self.playlist.clear()
-        self.track_metadata.clear()
+        self._playlist_set.clear()
         self.playlist_box.delete(0, tk.END)
         self.current_track_index = -1
         self.track_label.config(text="No track loaded")
@@ -610,16 +968,29 @@ class MusicPlayer:
             pygame.mixer.music.play()
             self.seek_offset = 0
             
-            # Load album art and metadata
-            self.load_album_art(track)
-            self.load_track_metadata(track)
+            # Read tags, album art and length with a single Mutagen open,
+            # skipping it entirely when everything is already cached
+            info = self.track_metadata.get(track)
+            art_known = track in self._art_cache or (info and info.get('has_art') is False)
+            if art_known and info and info.get('length'):
+                length, album_art_data = info['length'], None
+            else:
+                length, info, album_art_data = self._open_track(track)
+                self.track_metadata.setdefault(track, {}).update(
+                    info, length=length, has_art=album_art_data is not None
+                )
+                self._metadata_dirty = True
+            self._track_length = length or 100
             
-            # Get track length
-            try:
-                sound = pygame.mixer.Sound(track)
-                self._track_length = sound.get_length()
-            except:
-                self._track_length = 100
+            # The total time only changes when the track does
+            self.time_scrubber.config(to=self._track_length)
+            self.total_time_label.config(text=self.format_time(self._track_length))
+            self._last_cur_s = -1
+            
+            # Load album art and metadata
+            self.load_album_art(track, album_art_data)
+            self.load_track_metadata(info)
+            self.load_visualizer_samples(track, length)
             
             # Update display
             self.track_label.config(text=f"Now Playing: {Path(track).stem}")
@@ -627,19 +998,26 @@ class MusicPlayer:
             self.playlist_box.select_set(self.current_track_index)
             self.playlist_box.see(self.current_track_index)
         
-        # Check if track has ended
-        self.root.after(1000, self.check_track_end)
+        # Watch for the end of the track and keep the scrubber moving
+        self.schedule_playback_updates()
+        self.wake_visualizer()
     
     def pause_music(self):
         if pygame.mixer.music.get_busy():
             pygame.mixer.music.pause()
             self.is_paused = True
+            self.cancel_playback_updates()
             self.debug("Music paused")
     
     def stop_music(self):
         pygame.mixer.music.stop()
+        # Stopping posts an end event too; drop it so it doesn't skip a track
+        self.clear_track_end_event()
+        self.cancel_playback_updates()
         self.is_paused = False
-        self.bar_heights = [0] * self.visualizer_bars
+        self.bar_heights.fill(0)
+        self.release_visualizer_samples()
+        self.reset_scrubber()
         self.debug("Music stopped")
     
     def toggle_shuffle(self):
@@ -694,7 +1072,9 @@ class MusicPlayer:
     def change_volume(self, value):
         self.volume = float(value) / 100
         pygame.mixer.music.set_volume(self.volume)
-        self.debug(f"Volume changed to {int(self.volume * 100)}%")
+        # The slider calls this for every step while dragging
+        if self.debug_mode:
+            self.debug(f"Volume changed to {int(self.volume * 100)}%")
     
     def start_seek(self, event):
         """Called when user starts dragging the scrubber."""
@@ -711,9 +1091,14 @@ class MusicPlayer:
         self.seek_offset = seek_position
         self.debug(f"Seeking to {self.format_time(seek_position)}")
         
+        # Show the new position now; the scrubber tick doesn't run while paused
+        self._last_cur_s = int(seek_position)
+        self.current_time_label.config(text=self.format_time(self._last_cur_s))
+        
         # Stop current playback
         was_paused = self.is_paused
         pygame.mixer.music.stop()
+        self.clear_track_end_event()
         
         # Reload and play from new position
         track = self.playlist[self.current_track_index]
@@ -723,33 +1108,87 @@ class MusicPlayer:
         # If it was paused, pause again
         if was_paused:
             pygame.mixer.music.pause()
+        else:
+            self.schedule_playback_updates()
         
         self.is_seeking = False
     
-    def check_track_end(self):
-        """Monitor track playback and update UI elements."""
-        if pygame.mixer.music.get_busy() or self.is_paused:
-            # Update time scrubber (but not while user is seeking)
-            if not self.is_seeking:
-                try:
-                    current_pos = (pygame.mixer.music.get_pos() / 1000.0) + self.seek_offset
-                    if hasattr(self, '_track_length'):
-                        self.time_scrubber.config(to=self._track_length)
-                        self.time_scrubber.set(current_pos)
-                        self.current_time_label.config(text=self.format_time(current_pos))
-                        self.total_time_label.config(text=self.format_time(self._track_length))
-                except:
-                    pass
-            # Continue checking
-            self.root.after(1000, self.check_track_end)
+    def schedule_playback_updates(self):
+        """Start the event pump and scrubber ticks for the current playback."""
+        self.cancel_playback_updates()
+        self._pump_job = self.root.after(200, self._pump_pygame_events)
+        self._tick_job = self.root.after(1000, self._tick_scrubber)
+    
+    def cancel_playback_updates(self):
+        """Stop the event pump and scrubber ticks."""
+        for job in (self._pump_job, self._tick_job):
+            if job is not None:
+                self.root.after_cancel(job)
+        self._pump_job = None
+        self._tick_job = None
+    
+    def reset_scrubber(self):
+        """Move the scrubber and current time back to the start."""
+        self.time_scrubber.set(0)
+        self.current_time_label.config(text="0:00")
+        self._last_cur_s = 0
+    
+    def clear_track_end_event(self):
+        """Discard a queued end-of-track event after an explicit stop."""
+        if self._has_event_queue:
+            pygame.event.clear(TRACK_END_EVENT)
+    
+    def _pump_pygame_events(self):
+        """Handle pygame events, playing the next track when one ends."""
+        self._pump_job = None
+        track_ended = False
+        if self._has_event_queue:
+            for event in pygame.event.get():
+                if event.type == TRACK_END_EVENT:
+                    track_ended = True
         else:
-            # Track has ended, play next
-            if self.playlist and self.current_track_index != -1:
-                self.next_track()
-            else:
-                # Reset scrubber
-                self.time_scrubber.set(0)
-                self.current_time_label.config(text="0:00")
+            # No event queue: the pump only runs while playing, so not busy means it ended
+            track_ended = not pygame.mixer.music.get_busy()
+        
+        if not track_ended:
+            self._pump_job = self.root.after(200, self._pump_pygame_events)
+        elif self.playlist and self.current_track_index != -1:
+            self.next_track()
+        else:
+            self.cancel_playback_updates()
+            self.reset_scrubber()
+    
+    def _tick_scrubber(self):
+        """Update the time scrubber once a second while playing."""
+        self._tick_job = None
+        if not pygame.mixer.music.get_busy() or self.is_paused:
+            return
+        
+        # Update time scrubber (but not while user is seeking)
+        if not self.is_seeking:
+            try:
+                current_pos = (pygame.mixer.music.get_pos() / 1000.0) + self.seek_offset
+                cur_s = int(current_pos)
+                # Only touch the widgets when the displayed second changes
+                if hasattr(self, '_track_length') and cur_s != self._last_cur_s:
+                    self.time_scrubber.set(current_pos)
+                    self.current_time_label.config(text=self.format_time(cur_s))
+                    self._last_cur_s = cur_s
+            except:
+                pass
+        
+        self._tick_job = self.root.after(1000, self._tick_scrubber)
+    
+    def on_close(self):
+        """Save the metadata cache and shut down when the window is closed."""
+        self.stop_music()
+        self.save_metadata_cache()
+        self.cancel_scans()
+        if self._pending_art_future is not None:
+            self._pending_art_future.cancel()
+        self._art_executor.shutdown(wait=False)
+        self._tag_executor.shutdown(wait=False)
+        self.root.destroy()
 
 
 # ==================== APPLICATION ENTRY POINT ====================